@@ -1,10 +1,17 @@
 import struct
 import os
 import json
+import mmap
 from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Optional, Tuple, Union, Dict
 
+import numpy as np
+
+# Precompiled header format; unpack_from skips both the format re-parse
+# and the buffer slice of plain struct.unpack
+_S_HEADER = struct.Struct('<8I')
+
 @dataclass
 class HeadlineHeader:
     magic1: int
@@ -17,82 +24,116 @@ class HeadlineHeader:
     magic5: int
 
     @classmethod
-    def from_bytes(cls, data: bytes) -> 'HeadlineHeader':
-        if len(data) < 32:
+    def from_buffer(cls, buf, offset: int = 0) -> 'HeadlineHeader':
+        if len(buf) < offset + 32:
             raise ValueError("File too short for header")
-        unpacked = struct.unpack('<8I', data[:32])
-        return cls(*unpacked)
+        return cls(*_S_HEADER.unpack_from(buf, offset))
 
 class Headlines:
     def __init__(self, path: Union[str, Path]):
         self.path = Path(path)
+        # Map the store instead of copying it into a bytes object; all
+        # parsing below works on zero-copy views of the mapping.
         with open(self.path, 'rb') as f:
-            self.data = f.read()
-            
-        self.header = HeadlineHeader.from_bytes(self.data)
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.header = HeadlineHeader.from_buffer(self.data)
         
         self.entry_count = self.header.entry_count
         self.stride = self.header.record_stride if self.header.record_stride != 0 else 24
         self.records_base = self.header.records_offset
         self.strings_base = self.header.strings_offset
-        
-        # Performance optimization: cache for decoded strings
-        self._str_cache: Dict[int, str] = {0: ""}
+
+        # Parse the whole record table in one C-level pass instead of
+        # unpacking 24 bytes per call. The dtype itemsize matches the
+        # record stride, so padding/zero fields are skipped for free.
+        rec_dtype = np.dtype({
+            'names':   ['page_id', 'item_id', 'prefix_off', 'headline_off', 'suffix_off'],
+            'formats': ['<u4', '<u2', '<u4', '<u4', '<u4'],
+            'offsets': [0, 4, 8, 12, 16],
+            'itemsize': self.stride,
+        })
+        self.recs = np.frombuffer(self.data, dtype=rec_dtype,
+                                  count=self.entry_count, offset=self.records_base)
+        # Combined (page_id << 16) | item_id key for binary search lookups.
+        self._keys = (self.recs['page_id'].astype(np.uint64) << 16) | self.recs['item_id']
+
+        self._build_term_index()
+
+    def _build_term_index(self):
+        # Locate every UTF-16 NUL terminator in the strings section with a
+        # single pass instead of a bytes.find() scan per lookup. The u2 view
+        # only sees 2-byte-aligned positions, so no alignment check is needed.
+        n_units = (len(self.data) - self.strings_base) // 2
+        u16 = np.frombuffer(self.data, dtype='<u2', count=n_units, offset=self.strings_base)
+        self._term_idx = np.flatnonzero(u16 == 0)
+
+        # Decode the whole blob once and split on the terminators; piece i
+        # is the text between terminators i-1 and i, so a record offset
+        # maps to a piece index via one searchsorted.
+        sect_end = self.strings_base + 2 * n_units
+        self._strings = self.data[self.strings_base:sect_end].decode(
+            'utf-16le', errors='replace').split('\x00')
 
     def _get_string(self, offset: int) -> str:
-        if offset in self._str_cache:
-            return self._str_cache[offset]
-        
+        # Offset 0 is the "no string" sentinel used by prefix/suffix fields
+        if offset == 0:
+            return ""
+
         abs_off = self.strings_base + offset
         if abs_off >= len(self.data):
              return ""
-            
-        # Use fast find for null terminator
-        curr = abs_off
-        null_pos = -1
-        while True:
-            # Search for \x00\x00 (UTF-16LE null)
-            p = self.data.find(b'\x00\x00', curr)
-            if p == -1:
-                break
-                
-            # Alignment check: must be at an even offset from the string start
-            if (p - abs_off) % 2 == 0:
-                null_pos = p
-                break
-            curr = p + 1
-            
-        if null_pos == -1:
-            res = self.data[abs_off:].decode('utf-16le', errors='replace')
-        else:
-            res = self.data[abs_off:null_pos].decode('utf-16le', errors='replace')
-            
-        self._str_cache[offset] = res
-        return res
+
+        # Binary search the precomputed terminator index for the first NUL
+        # code-unit at or after this string's start
+        unit = offset >> 1
+        pos = int(np.searchsorted(self._term_idx, unit))
+        if pos >= len(self._term_idx):
+            return self.data[abs_off:].decode('utf-16le', errors='replace')
+        if self._term_idx[pos] == unit:
+            return ""
+
+        start = 0 if pos == 0 else int(self._term_idx[pos - 1]) + 1
+        if start == unit:
+            return self._strings[pos]
+
+        # Offset points into the middle of a stored string; decode just
+        # that tail
+        null_pos = self.strings_base + 2 * int(self._term_idx[pos])
+        return self.data[abs_off:null_pos].decode('utf-16le', errors='replace')
 
     def get_by_index(self, index: int) -> Tuple[int, int, str]:
         if index >= self.entry_count:
             raise IndexError()
-            
-        rec_off = self.records_base + index * self.stride
-        
-        # Use unpack_from to avoid slicing the buffer
-        # Structure: page_id(4), item_id(2), magic(2), prefixOff(4), headlineOff(4), suffixOff(4), magic(4)
-        page_id, item_id, _, prefix_off, headline_off, suffix_off, _ = struct.unpack_from('<IHHIIII', self.data, rec_off)
-        
-        prefix = self._get_string(prefix_off)
-        headline = self._get_string(headline_off)
-        suffix = self._get_string(suffix_off)
-        
-        return page_id, item_id, prefix + headline + suffix
+
+        rec = self.recs[index]
+
+        prefix = self._get_string(int(rec['prefix_off']))
+        headline = self._get_string(int(rec['headline_off']))
+        suffix = self._get_string(int(rec['suffix_off']))
+
+        return int(rec['page_id']), int(rec['item_id']), prefix + headline + suffix
+
+    def get(self, page_id: int, item_id: int = 0) -> Optional[Tuple[int, int, str]]:
+        # Records are sorted by (page_id, item_id), so binary search the
+        # precomputed combined keys.
+        key = (page_id << 16) | item_id
+        pos = int(np.searchsorted(self._keys, key))
+        if pos >= self.entry_count or self._keys[pos] != key:
+            return None
+        return self.get_by_index(pos)
 
     def __len__(self):
         return self.entry_count
 
     def __iter__(self):
-        # We can iterate using range to call optimized get_by_index
-        for i in range(self.entry_count):
-            yield self.get_by_index(i)
+        # One C-level conversion of the record table instead of per-row
+        # ndarray scalar access
+        get_string = self._get_string
+        for page_id, item_id, prefix_off, headline_off, suffix_off in self.recs.tolist():
+            yield page_id, item_id, (get_string(prefix_off)
+                                     + get_string(headline_off)
+                                     + get_string(suffix_off))
 
 if __name__ == "__main__":
     import sys
@@ -111,8 +152,7 @@ if __name__ == "__main__":
     print(f"Entry Count: {count}")
     
     out_map = {}
-    for i in range(count):
-        page_id, item_id, text = headlines.get_by_index(i)
+    for i, (page_id, item_id, text) in enumerate(headlines):
         page_key = f"{page_id:05}" if item_id == 0 else f"{page_id:05}-{item_id:04x}"
         out_map[page_key] = text
         
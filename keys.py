@@ -1,77 +1,142 @@
 import struct
 import os
+import mmap
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional, List, Tuple, Union, Iterator
 import json
 
-@dataclass
-class EntryId:
-    page: int
-    item: int
-    extra: int = 0
-    type: int = 0
-    has_type: bool = False
+import numpy as np
 
-def decode_keystore_entry(data: bytes, offset: int) -> Tuple[EntryId, int]:
-    if offset >= len(data):
-        raise ValueError("Truncated entry data")
-    
-    flags = data[offset]
-    offset += 1
-    entry = EntryId(page=0, item=0)
-    
-    # Page
-    if flags & 0x01:
-        entry.page = data[offset]
-        offset += 1
-    elif flags & 0x02:
-        entry.page = struct.unpack('>H', data[offset:offset+2])[0]
-        offset += 2
-    elif flags & 0x04:
-        # 3-byte big-endian
-        entry.page = (data[offset] << 16) | (data[offset+1] << 8) | data[offset+2]
-        offset += 3
-    
-    # Item
-    if flags & 0x10:
-        entry.item = data[offset]
-        offset += 1
-    elif flags & 0x20:
-        entry.item = struct.unpack('>H', data[offset:offset+2])[0]
-        offset += 2
-        
-    # Extra
-    if flags & 0x40:
-        entry.extra = data[offset]
-        offset += 1
-    elif flags & 0x80:
-        entry.extra = struct.unpack('>H', data[offset:offset+2])[0]
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Precompiled formats; unpack_from avoids both the per-call format parse
+# and the buffer-slice allocation
+_S_U32 = struct.Struct('<I')
+_S_HEADER = struct.Struct('<4I')
+_S_IDX_HEADER = struct.Struct('<5I')
+_S_CONV_ENTRY = struct.Struct('<IHH')
+
+# Hiragana -> katakana is a constant codepoint offset across the kana
+# block; str.translate runs the whole conversion in one C-level pass
+_HIRA_TO_KATA = {c: c + (ord('ア') - ord('あ')) for c in range(ord('ぁ'), ord('ん') + 1)}
+
+def to_katakana(s: str) -> str:
+    """Normalize hiragana to katakana, as keystore keys are stored in katakana."""
+    return s.translate(_HIRA_TO_KATA)
+
+def _decode_pages(buf, offset, wide_count):
+    # Decode the variable-length (page, item) list at `offset` into an
+    # (N, 2) uint32 array. Kept numba-njit compatible: plain integer
+    # arithmetic on a uint8 buffer, no Python object creation per entry.
+    if wide_count:
+        count = (int(buf[offset]) | (int(buf[offset+1]) << 8)
+                 | (int(buf[offset+2]) << 16) | (int(buf[offset+3]) << 24))
+        offset += 4
+    else:
+        count = int(buf[offset]) | (int(buf[offset+1]) << 8)
         offset += 2
-        
-    # Type
-    if flags & 0x08:
-        entry.type = data[offset]
+
+    out = np.empty((count, 2), np.uint32)
+    for i in range(count):
+        flags = int(buf[offset])
         offset += 1
-        entry.has_type = True
-        
-    return entry, offset
+        page = 0
+        item = 0
+
+        # Page (big-endian, 1-3 bytes)
+        if flags & 0x01:
+            page = int(buf[offset])
+            offset += 1
+        elif flags & 0x02:
+            page = (int(buf[offset]) << 8) | int(buf[offset+1])
+            offset += 2
+        elif flags & 0x04:
+            page = (int(buf[offset]) << 16) | (int(buf[offset+1]) << 8) | int(buf[offset+2])
+            offset += 3
+
+        # Item
+        if flags & 0x10:
+            item = int(buf[offset])
+            offset += 1
+        elif flags & 0x20:
+            item = (int(buf[offset]) << 8) | int(buf[offset+1])
+            offset += 2
+
+        # Extra (unused, skip)
+        if flags & 0x40:
+            offset += 1
+        elif flags & 0x80:
+            offset += 2
+
+        # Type (unused, skip)
+        if flags & 0x08:
+            offset += 1
+
+        out[i, 0] = page
+        out[i, 1] = item
+    return out
+
+def _make_entry_decoder(flags: int):
+    # Specialize one straight-line decoder for this flags byte: the
+    # field widths are fixed per value, so the if/elif chain runs once
+    # here instead of once per record.
+    page_len = 1 if flags & 0x01 else 2 if flags & 0x02 else 3 if flags & 0x04 else 0
+    item_len = 1 if flags & 0x10 else 2 if flags & 0x20 else 0
+    skip = (1 if flags & 0x40 else 2 if flags & 0x80 else 0) + (1 if flags & 0x08 else 0)
+    advance = page_len + item_len + skip
+
+    if page_len == 0:
+        read_page = lambda buf, off: 0
+    elif page_len == 1:
+        read_page = lambda buf, off: int(buf[off])
+    elif page_len == 2:
+        read_page = lambda buf, off: (int(buf[off]) << 8) | int(buf[off+1])
+    else:
+        read_page = lambda buf, off: (int(buf[off]) << 16) | (int(buf[off+1]) << 8) | int(buf[off+2])
+
+    if item_len == 0:
+        read_item = lambda buf, off: 0
+    elif item_len == 1:
+        read_item = lambda buf, off: int(buf[off])
+    else:
+        read_item = lambda buf, off: (int(buf[off]) << 8) | int(buf[off+1])
+
+    def decode(buf, off, _rp=read_page, _ri=read_item, _pl=page_len, _adv=advance):
+        return _rp(buf, off), _ri(buf, off + _pl), off + _adv
+    return decode
+
+_ENTRY_DECODERS = [_make_entry_decoder(f) for f in range(256)]
 
-def decode_entry_ids(data: bytes, wide_count: bool) -> List[EntryId]:
+def _decode_pages_table(buf, offset, wide_count):
+    # Interpreted fallback for _decode_pages: dispatch each record once
+    # through the precompiled per-flags decoder table.
     if wide_count:
-        if len(data) < 4: raise ValueError("Truncated count")
-        count = struct.unpack('<I', data[:4])[0]
-        offset = 4
+        count = (int(buf[offset]) | (int(buf[offset+1]) << 8)
+                 | (int(buf[offset+2]) << 16) | (int(buf[offset+3]) << 24))
+        offset += 4
     else:
-        if len(data) < 2: raise ValueError("Truncated count")
-        count = struct.unpack('<H', data[:2])[0]
-        offset = 2
-        
-    entries = []
-    for _ in range(count):
-        entry, offset = decode_keystore_entry(data, offset)
-        entries.append(entry)
-    return entries
+        count = int(buf[offset]) | (int(buf[offset+1]) << 8)
+        offset += 2
+
+    out = np.empty((count, 2), np.uint32)
+    decoders = _ENTRY_DECODERS
+    for i in range(count):
+        page, item, offset = decoders[buf[offset]](buf, offset + 1)
+        out[i, 0] = page
+        out[i, 1] = item
+    return out
+
+if numba is not None:
+    # The buffer is a read-only contiguous view of the mmap and every
+    # offset comes from the file's own tables, so bounds checks are
+    # pure overhead in the compiled kernel
+    _decode_pages = numba.njit(cache=True, boundscheck=False)(_decode_pages)
+else:
+    _decode_pages = _decode_pages_table
 
 @dataclass
 class ConversionEntry:
@@ -82,9 +147,12 @@ class Keys:
     def __init__(self, path: Union[str, Path], dict_id: Optional[str] = None):
         self.path = Path(path)
         self.dict_id = dict_id
+        # Map the keystore instead of copying it into a bytes object; the
+        # uint8 view below shares the mapping, no userspace copy.
         with open(self.path, 'rb') as f:
-            self.data = f.read()
-            
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.word_data_np = np.frombuffer(self.data, dtype=np.uint8)
+
         self._parse_header()
         self._parse_indices()
         self._parse_conv_table()
@@ -93,23 +161,23 @@ class Keys:
         if len(self.data) < 16:
             raise Exception("File too small for header")
         
-        self.version, self.magic1, self.words_offset, self.index_offset = struct.unpack('<4I', self.data[:16])
-        
+        self.version, self.magic1, self.words_offset, self.index_offset = _S_HEADER.unpack_from(self.data, 0)
+
         if self.version not in (0x10000, 0x20000):
             raise Exception(f"Invalid keystore version: 0x{self.version:x}")
-            
+
         self.conv_table_offset = 0
         if self.version == 0x20000:
             if len(self.data) < 32:
                 raise Exception("File too small for V2 header")
-            self.conv_table_offset, m5, m6, m7 = struct.unpack('<4I', self.data[16:32])
+            self.conv_table_offset, m5, m6, m7 = _S_HEADER.unpack_from(self.data, 16)
 
     def _parse_indices(self):
         idx_base = self.index_offset
         if len(self.data) < idx_base + 20:
             raise Exception("Index section header truncated")
             
-        magic, oA, oB, oC, oD = struct.unpack('<5I', self.data[idx_base:idx_base+20])
+        magic, oA, oB, oC, oD = _S_IDX_HEADER.unpack_from(self.data, idx_base)
         if magic != 0x04:
             raise Exception(f"Invalid index magic: 0x{magic:x}")
             
@@ -122,25 +190,25 @@ class Keys:
         for i in range(4):
             start = offsets[i]
             if start == 0:
-                self.indices.append([])
+                self.indices.append(np.empty(0, dtype='<u4'))
                 continue
-                
+
             # Find next non-zero offset
             end = section_size
             for j in range(i + 1, 5):
                 if offsets[j] != 0:
                     end = offsets[j]
                     break
-            
+
             if end <= start:
-                self.indices.append([])
+                self.indices.append(np.empty(0, dtype='<u4'))
                 continue
-                
-            idx_data = self.data[idx_base + start : idx_base + end]
-            count = struct.unpack('<I', idx_data[:4])[0]
-            # Each index entry is 4 bytes
-            offsets_list = struct.unpack(f'<{count}I', idx_data[4:4 + count*4])
-            self.indices.append(list(offsets_list))
+
+            count = _S_U32.unpack_from(self.data, idx_base + start)[0]
+            # Each index entry is 4 bytes; one bulk reinterpret instead of
+            # count PyLong allocations
+            self.indices.append(np.frombuffer(self.data, dtype='<u4', count=count,
+                                              offset=idx_base + start + 4))
 
     def _parse_conv_table(self):
         self.conv_table = []
@@ -150,11 +218,11 @@ class Keys:
         if not (self.dict_id in ("KNEJ.EJ", "KNJE.JE")):
             return
             
-        count = struct.unpack('<I', self.data[self.conv_table_offset : self.conv_table_offset + 4])[0]
+        count = _S_U32.unpack_from(self.data, self.conv_table_offset)[0]
         entry_size = 8
         base = self.conv_table_offset + 4
         for i in range(count):
-            page, item, padding = struct.unpack('<IHH', self.data[base + i*entry_size : base + (i+1)*entry_size])
+            page, item, padding = _S_CONV_ENTRY.unpack_from(self.data, base + i*entry_size)
             self.conv_table.append(ConversionEntry(page, item))
 
     def __len__(self):
@@ -162,41 +230,74 @@ class Keys:
         return len(self.indices[1])
 
     def get_word_entry(self, offset: int) -> Tuple[str, int, int]:
+        # Fused single-pass read: one attribute lookup for the buffer,
+        # one unpack, one find, one slice+decode. Called in tight loops.
+        data = self.data
         abs_off = self.words_offset + offset
-        pages_offset = struct.unpack('<I', self.data[abs_off : abs_off + 4])[0]
-        flags = self.data[abs_off + 4]
-        
+        pages_offset, = _S_U32.unpack_from(data, abs_off)
+
         str_begin = abs_off + 5
-        null_pos = self.data.find(b'\0', str_begin)
+        null_pos = data.find(b'\0', str_begin)
         if null_pos == -1:
             raise Exception("Unterminated word string")
-            
-        key = self.data[str_begin:null_pos].decode('utf-8')
-        return key, pages_offset, flags
 
-    def get_entry_ids(self, pages_offset: int, flags: int) -> List[Tuple[int, int]]:
+        return data[str_begin:null_pos].decode('utf-8'), pages_offset, data[abs_off + 4]
+
+    def get_page_array(self, pages_offset: int, flags: int) -> np.ndarray:
         wide_count = (flags & 0x04) != 0
         abs_off = self.words_offset + pages_offset
-        
-        # We don't know the exact end of pages data, so we decode as much as needed
-        data_to_decode = self.data[abs_off:]
-        entries = decode_entry_ids(data_to_decode, wide_count)
-        
+        return _decode_pages(self.word_data_np, abs_off, wide_count)
+
+    def get_entry_ids(self, pages_offset: int, flags: int) -> List[Tuple[int, int]]:
+        pairs = self.get_page_array(pages_offset, flags)
+        conv_table = self.conv_table
+
         result = []
-        for e in entries:
-            page, item = e.page, e.item
-            if self.conv_table and page < len(self.conv_table):
-                mapped = self.conv_table[page]
+        for page, item in pairs.tolist():
+            if conv_table and page < len(conv_table):
+                mapped = conv_table[page]
                 page, item = mapped.page, mapped.item
             result.append((page, item))
-            
+
         return result
 
+    def search_exact(self, key: str, idx_type: int = 1) -> Optional[List[Tuple[int, int]]]:
+        index = self.indices[idx_type]
+        n = len(index)
+        if n == 0:
+            return None
+
+        # Encode once per query, then bisect against the word bytes in
+        # place - no word list to materialize and no per-step decode. A
+        # stored word that is a strict prefix of the target includes its
+        # NUL in the compared slice, which sorts below every real byte,
+        # so plain slice comparison gives the right order.
+        target = to_katakana(key).encode('utf-8')
+        tlen = len(target)
+        data = self.data
+        words_offset = self.words_offset
+
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = words_offset + int(index[mid]) + 5
+            if data[start:start + tlen] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        if lo < n:
+            start = words_offset + int(index[lo]) + 5
+            if data[start:start + tlen] == target and data[start + tlen : start + tlen + 1] == b'\0':
+                _, pages_off, flags = self.get_word_entry(int(index[lo]))
+                return self.get_entry_ids(pages_off, flags)
+        return None
+
     def get_by_index(self, idx_type: int, index: int) -> Tuple[str, List[Tuple[int, int]]]:
         if idx_type >= 4 or index >= len(self.indices[idx_type]):
             raise IndexError()
             
-        offset = self.indices[idx_type][index]
+        offset = int(self.indices[idx_type][index])
         key, pages_off, flags = self.get_word_entry(offset)
         return key, self.get_entry_ids(pages_off, flags)
 
@@ -1,5 +1,6 @@
 import os
 import struct
+import mmap
 import zlib
 import argparse
 import zipfile
@@ -7,42 +8,49 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Optional, Tuple, Union, Dict
 
+import numpy as np
+
+# Precompiled header format; unpack_from avoids the per-call format
+# parse and the buffer slice
+_S_HEADER = struct.Struct('<II')
+
 @dataclass
 class NamedResourceStoreIndexHeader:
     magic: int
     record_count: int
 
     @classmethod
-    def from_bytes(cls, data: bytes) -> 'NamedResourceStoreIndexHeader':
-        if len(data) < 8:
+    def from_buffer(cls, buf, offset: int = 0) -> 'NamedResourceStoreIndexHeader':
+        if len(buf) < offset + 8:
             raise ValueError("Size of index header must be at least 8 bytes")
-        magic, count = struct.unpack('<II', data[:8])
-        return cls(magic, count)
-
-@dataclass
-class NamedResourceStoreIndexRecord:
-    format_type: int    # 0 = uncompressed, 1 = zlib
-    file_sequence: int  # {seq}.nrsc
-    id_offset: int      # absolute offset from start of .nidx
-    file_offset: int    # offset within {seq}.nrsc
-    length: int         # length of (possibly compressed) data
+        return cls(*_S_HEADER.unpack_from(buf, offset))
 
-    @classmethod
-    def from_bytes(cls, data: bytes) -> 'NamedResourceStoreIndexRecord':
-        if len(data) < 16:
-            raise ValueError("Size of index record must be 16 bytes")
-        fmt, seq, id_off, f_off, length = struct.unpack('<HHIII', data[:16])
-        return cls(fmt, seq, id_off, f_off, length)
+# Index record layout: format_type 0 = uncompressed, 1 = zlib;
+# file_sequence selects {seq}.nrsc; id_offset is absolute from the start
+# of the .nidx; file_offset/length locate the (possibly compressed) data.
+IDX_DTYPE = np.dtype([
+    ('format_type', '<u2'),
+    ('file_sequence', '<u2'),
+    ('id_offset', '<u4'),
+    ('file_offset', '<u4'),
+    ('length', '<u4'),
+])
 
 class NamedResourceStore:
     def __init__(self, directory: Union[str, Path]):
         self.directory = Path(directory)
-        if not self.directory.is_directory():
+        if not self.directory.is_dir():
             raise FileNotFoundError(f"NRSC directory not found: {directory}")
             
         self._load_index()
         self._discover_data_files()
 
+        # One pool buffer sized to the largest record; every read lands in
+        # it via readinto, so get_data never grows the allocator
+        max_len = int(self.records['length'].max()) if len(self.records) else 0
+        self._read_buf = bytearray(max_len)
+        self._open_files: Dict[int, object] = {}
+
     def _load_index(self):
         # find .nidx file
         nidx_files = list(self.directory.glob("*.nidx"))
@@ -52,19 +60,32 @@ class NamedResourceStore:
              print(f"Warning: Multiple .nidx files found. Using {nidx_files[0]}")
              
         self.nidx_path = nidx_files[0]
+        # Map the index instead of copying it; the record table below is a
+        # zero-copy view of the mapping.
         with open(self.nidx_path, 'rb') as f:
-            header_data = f.read(8)
-            self.header = NamedResourceStoreIndexHeader.from_bytes(header_data)
-            
-            # Read records
-            self.records = []
-            for _ in range(self.header.record_count):
-                record_data = f.read(16)
-                self.records.append(NamedResourceStoreIndexRecord.from_bytes(record_data))
-            
-            # Read strings section
-            self.strings_base = 8 + self.header.record_count * 16
-            self.id_strings = f.read()
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._nidx_mm = buf
+
+        self.header = NamedResourceStoreIndexHeader.from_buffer(buf)
+
+        # Reinterpret the record table in place from the single read
+        self.records = np.frombuffer(buf, dtype=IDX_DTYPE,
+                                     count=self.header.record_count, offset=8)
+
+        # Strings section follows the record table
+        self.strings_base = 8 + self.header.record_count * 16
+        self.id_strings = buf[self.strings_base:]
+
+        # Split the id blob once instead of re-scanning it for a null
+        # terminator on every get_id_at call
+        self._offset_to_name: Dict[int, str] = {}
+        pos = 0
+        for part in self.id_strings.split(b'\0'):
+            self._offset_to_name[pos] = part.decode('utf-8', errors='replace')
+            pos += len(part) + 1
+
+        self._names = [self.get_id_at(int(off)) for off in self.records['id_offset']]
+        self._by_id = {name: rec for name, rec in zip(self._names, self.records)}
 
     def _discover_data_files(self):
         self.data_files: Dict[int, Path] = {}
@@ -80,31 +101,43 @@ class NamedResourceStore:
         rel_off = offset - self.strings_base
         if rel_off < 0 or rel_off >= len(self.id_strings):
              return f"unknown_{offset:x}"
-            
-        # Find null terminator
+
+        name = self._offset_to_name.get(rel_off)
+        if name is not None:
+            return name
+
+        # Offset points into the middle of a string; fall back to a scan
         null_pos = self.id_strings.find(b'\0', rel_off)
         if null_pos == -1:
             return self.id_strings[rel_off:].decode('utf-8', errors='replace')
         return self.id_strings[rel_off:null_pos].decode('utf-8', errors='replace')
 
-    def get_data(self, record: NamedResourceStoreIndexRecord) -> bytes:
-        if record.file_sequence not in self.data_files:
-            raise FileNotFoundError(f"Data file {record.file_sequence}.nrsc not found")
-            
-        path = self.data_files[record.file_sequence]
-        with open(path, 'rb') as f:
-            f.seek(record.file_offset)
-            data = f.read(record.length)
-            
-        if record.format_type == 1: # Zlib
-            return zlib.decompress(data)
-        return data
+    def get_by_id(self, id_: str) -> Optional[np.void]:
+        return self._by_id.get(id_)
+
+    def get_data(self, record: np.void) -> bytes:
+        seq = int(record['file_sequence'])
+        f = self._open_files.get(seq)
+        if f is None:
+            if seq not in self.data_files:
+                raise FileNotFoundError(f"Data file {seq}.nrsc not found")
+            f = open(self.data_files[seq], 'rb')
+            self._open_files[seq] = f
+
+        length = int(record['length'])
+        f.seek(int(record['file_offset']))
+        view = memoryview(self._read_buf)[:length]
+        f.readinto(view)
+
+        if record['format_type'] == 1: # Zlib
+            return zlib.decompress(view)
+        return bytes(view)
 
     def __len__(self):
         return len(self.records)
 
-    def entries(self) -> List[Tuple[str, NamedResourceStoreIndexRecord]]:
-        return [(self.get_id_at(r.id_offset), r) for r in self.records]
+    def entries(self) -> List[Tuple[str, np.void]]:
+        return list(zip(self._names, self.records))
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Extract Monokakido Named Resource Store (.nrsc)')
@@ -128,8 +161,8 @@ if __name__ == "__main__":
         print("\n%-40s %-10s %-10s %-6s" % ("ID", "FileSeq", "Length", "Format"))
         print("-" * 70)
         for name, r in nrsc.entries():
-            fmt = "Zlib" if r.format_type == 1 else "Raw"
-            print("%-40s %-10d %-10d %-6s" % (name, r.file_sequence, r.length, fmt))
+            fmt = "Zlib" if r['format_type'] == 1 else "Raw"
+            print("%-40s %-10d %-10d %-6s" % (name, r['file_sequence'], r['length'], fmt))
         exit(0)
         
     if args.output:
@@ -143,7 +176,15 @@ if __name__ == "__main__":
                     try:
                         data = nrsc.get_data(r)
                         fname = f"{name}{ext}" if not name.lower().endswith(ext.lower()) else name
-                        zf.writestr(fname, data)
+                        # Raw entries are typically already-compressed
+                        # media (AAC/PNG); storing them skips a pointless
+                        # deflate pass. Stream via zf.open instead of
+                        # buffering a second copy in writestr.
+                        zinfo = zipfile.ZipInfo(fname)
+                        zinfo.compress_type = (zipfile.ZIP_DEFLATED if r['format_type'] == 1
+                                               else zipfile.ZIP_STORED)
+                        with zf.open(zinfo, 'w') as out:
+                            out.write(data)
                         if (i + 1) % 100 == 0:
                             print(f"  Processed {i+1}/{len(nrsc)}...")
                     except Exception as e:
@@ -1,32 +1,24 @@
 import json
 import os
 import struct
+import mmap
 import zlib
 import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import List, Optional, Tuple, Union
-from bs4 import BeautifulSoup
+from lxml import etree
 
-@dataclass
-class IdxRecord:
-    item_id: int
-    map_idx: int
+import numpy as np
 
-    @staticmethod
-    def from_bytes(data: bytes) -> 'IdxRecord':
-        item_id, map_idx = struct.unpack('<II', data)
-        return IdxRecord(item_id, map_idx)
+# Precompiled formats; unpack_from avoids the per-call format parse and
+# the buffer-slice allocation
+_S_U32 = struct.Struct('<I')
+_S_2U32 = struct.Struct('<II')
 
-
-@dataclass
-class MapRecord:
-    zoffset: int
-    ioffset: int
-
-    @staticmethod
-    def from_bytes(data: bytes) -> 'MapRecord':
-        zoffset, ioffset = struct.unpack('<II', data)
-        return MapRecord(zoffset, ioffset)
+IDX_DTYPE = np.dtype([('item_id', '<u4'), ('map_idx', '<u4')])
+MAP_DTYPE = np.dtype([('zoffset', '<u4'), ('ioffset', '<u4')])
 
 # ==== 索引 ====
 @dataclass
@@ -37,30 +29,31 @@ class ResourceFile:
     file: object
     
 class RscIndex:
-    def __init__(self, idx: Optional[List[IdxRecord]], map_: List[MapRecord], version: int = 0):
+    def __init__(self, idx: Optional[np.ndarray], map_: np.ndarray, version: int = 0):
         self.idx = idx
         self.map = map_
         self.version = version
+        # Contiguous u4 column view for searchsorted lookups
+        self._item_ids = idx['item_id'] if idx is not None else None
 
     @staticmethod
-    def load_idx(path: str) -> Optional[List[IdxRecord]]:
+    def load_idx(path: str) -> Optional[np.ndarray]:
         file_path = path + ".idx"
         if not os.path.exists(file_path):
             return None
         with open(file_path, "rb") as f:
-            length = struct.unpack('<I', f.read(4))[0]
-            f.seek(8)
-            return [IdxRecord.from_bytes(f.read(8)) for _ in range(length)]
+            buf = f.read()
+        length = _S_U32.unpack_from(buf, 0)[0]
+        return np.frombuffer(buf, dtype=IDX_DTYPE, count=length, offset=8)
 
     @staticmethod
-    def load_map(path: str) -> Tuple[List[MapRecord], int]:
+    def load_map(path: str) -> Tuple[np.ndarray, int]:
         file_path = path + ".map"
         with open(file_path, "rb") as f:
-            version = struct.unpack('<I', f.read(4))[0]
-            length = struct.unpack('<I', f.read(4))[0]
-            f.seek(8)
-            records = [MapRecord.from_bytes(f.read(8)) for _ in range(length)]
-            return records, version
+            buf = f.read()
+        version, length = _S_2U32.unpack_from(buf, 0)
+        records = np.frombuffer(buf, dtype=MAP_DTYPE, count=length, offset=8)
+        return records, version
 
     @staticmethod
     def new(path: str, rsc_name: str) -> 'RscIndex':
@@ -72,40 +65,33 @@ class RscIndex:
     def get_map_idx_by_id(self, id_: int) -> int:
         if self.idx is None:
             return id_
-        idx_list = self.idx
-        if not idx_list:
+        item_ids = self._item_ids
+        if len(item_ids) == 0:
             return None
 
-        # Fast guess
+        # Fast guess for the common sequential case
         for guess in [id_, id_ - 1]:
-            if 0 <= guess < len(idx_list) and idx_list[guess].item_id == id_:
+            if 0 <= guess < len(item_ids) and item_ids[guess] == id_:
                 return guess
 
-        # Binary search
-        low, high = 0, len(idx_list)
-        while low < high:
-            mid = (low + high) // 2
-            mid_id = idx_list[mid].item_id
-            if mid_id < id_:
-                low = mid + 1
-            else:
-                high = mid
-        if low < len(idx_list) and idx_list[low].item_id == id_:
-            map_idx = idx_list[low].map_idx
+        # Single C-level binary search instead of a Python bisect loop
+        pos = int(np.searchsorted(item_ids, id_))
+        if pos < len(item_ids) and item_ids[pos] == id_:
+            map_idx = int(self.idx['map_idx'][pos])
             if map_idx >= len(self.map):
                 return None
             return map_idx
         return None
 
-    def get_by_id(self, id_: int) -> MapRecord:
+    def get_by_id(self, id_: int) -> np.void:
         return self.map[self.get_map_idx_by_id(id_)]
 
-    def get_by_idx(self, idx: int) -> Tuple[int, MapRecord]:
-        if self.idx:
+    def get_by_idx(self, idx: int) -> Tuple[int, np.void]:
+        if self.idx is not None:
             rec = self.idx[idx]
-            if not rec or rec.map_idx != idx:
+            if rec['map_idx'] != idx:
                 return None
-            item_id = rec.item_id
+            item_id = int(rec['item_id'])
         else:
             item_id = idx
 
@@ -181,7 +167,7 @@ class ResourceStoreCrypto:
             raise ValueError("Encrypted data too short")
         
         data_len = len(encrypted_data) - 4
-        checksum = struct.unpack('<I', encrypted_data[data_len:])[0]
+        checksum = _S_U32.unpack_from(encrypted_data, data_len)[0]
         output_len = checksum ^ ResourceStoreCrypto.CHECKSUM_XOR
         
         if output_len > data_len:
@@ -213,14 +199,21 @@ class ResourceStoreCrypto:
         return bytes(output[:output_len])
 
 class Rsc:
-    def __init__(self, index: RscIndex, files: List[ResourceFile], key: Optional[bytes] = None):
+    # Decompressed blocks kept alive for random-access workloads; each
+    # block typically holds many entries, so even a small cache avoids
+    # most repeat zlib.decompress calls.
+    BLOCK_CACHE_SIZE = 8
+
+    def __init__(self, index: RscIndex, files: List[ResourceFile], key: Optional[bytes] = None,
+                 zdict: Optional[bytes] = None):
         self.index = index
         self.files = files
         self.key = key
-        self.zlib_buf = bytearray()
-        self.contents_buf = bytearray()
-        self.current_offset = -1
-        self.current_len = 0
+        # Optional preset dictionary shared by all blocks; when set, every
+        # inflate starts with it preloaded instead of re-deriving the
+        # common prefix from scratch.
+        self.zdict = zdict
+        self._block_cache: 'OrderedDict[int, bytes]' = OrderedDict()
 
     @staticmethod
     def parse_fname(rsc_name: str, fname: str) -> Optional[int]:
@@ -238,7 +231,11 @@ class Rsc:
             seq = Rsc.parse_fname(rsc_name, fname)
             if seq is not None:
                 full = os.path.join(path, fname)
-                files.append(ResourceFile(seq, os.path.getsize(full), 0, open(full, "rb")))
+                # Map each data file; block reads become slices of the
+                # mapping instead of seek+read round trips
+                with open(full, "rb") as fh:
+                    mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                files.append(ResourceFile(seq, len(mm), 0, mm))
         files.sort(key=lambda f: f.seqnum)
         offset = 0
         for i, f in enumerate(files):
@@ -249,67 +246,85 @@ class Rsc:
         return files
 
     @staticmethod
-    def new(path: str, rsc_name: str, dict_id: Optional[str] = None) -> 'Rsc':
+    def new(path: str, rsc_name: str, dict_id: Optional[str] = None,
+            zdict: Optional[bytes] = None) -> 'Rsc':
         index = RscIndex.new(path, rsc_name)
         files = Rsc.files(path, rsc_name)
         # Only derive key if version is 1, matching C++ logic
         key = None
         if index.version == 1 and dict_id:
             key = ResourceStoreCrypto.derive_key(dict_id)
-        return Rsc(index, files, key)
+        return Rsc(index, files, key, zdict)
+
+    def _load_block(self, zoffset: int) -> bytes:
+        mm, f_offset = file_offset(self.files, zoffset)
+        marker = _S_U32.unpack_from(mm, f_offset)[0]
 
-    def load_contents(self, zoffset: int):
-        f, f_offset = file_offset(self.files, zoffset)
-        f.seek(f_offset)
-        marker = struct.unpack('<I', f.read(4))[0]
-        
         if marker == 0:
             if not self.key:
                 raise ValueError("Encountered encrypted chunk but no dict_id provided.")
-            encrypted_len = struct.unpack('<I', f.read(4))[0]
-            raw_data = f.read(encrypted_len)
+            encrypted_len = _S_U32.unpack_from(mm, f_offset + 4)[0]
+            raw_data = mm[f_offset + 8 : f_offset + 8 + encrypted_len]
             raw_data = ResourceStoreCrypto.decrypt(raw_data, self.key)
         else:
             compressed_len = marker
-            raw_data = f.read(compressed_len)
-        
+            raw_data = mm[f_offset + 4 : f_offset + 4 + compressed_len]
+
         # Check if zlib compressed (usually starts with 0x78)
         if len(raw_data) > 0 and raw_data[0] == 0x78:
             try:
-                self.contents_buf = zlib.decompress(raw_data)
+                return self._inflate(raw_data)
             except zlib.error:
-                self.contents_buf = raw_data
+                return raw_data
+        return raw_data
+
+    def _inflate(self, raw_data: bytes) -> bytes:
+        # zlib.decompress has no zdict parameter, so go through a
+        # decompressobj. Independent streams can't share inflate state,
+        # but the preset dictionary saves the back-reference warmup on
+        # every block.
+        if self.zdict is not None:
+            d = zlib.decompressobj(zdict=self.zdict)
         else:
-            self.contents_buf = raw_data
-            
-        self.current_offset = zoffset
-        self.current_len = len(self.contents_buf)
+            d = zlib.decompressobj()
+        return d.decompress(raw_data) + d.flush()
+
+    def _get_block(self, zoffset: int) -> bytes:
+        cache = self._block_cache
+        contents = cache.get(zoffset)
+        if contents is not None:
+            cache.move_to_end(zoffset)
+            return contents
+        contents = self._load_block(zoffset)
+        cache[zoffset] = contents
+        if len(cache) > self.BLOCK_CACHE_SIZE:
+            cache.popitem(last=False)
+        return contents
 
     def read_direct_data(self, zoffset: int) -> bytes:
-        f, f_offset = file_offset(self.files, zoffset)
-        f.seek(f_offset)
-        length = struct.unpack('<I', f.read(4))[0]
-        return f.read(length)
-
-    def get_by_map(self, rec: MapRecord) -> bytes:
-        if rec.ioffset == 0xFFFFFFFF:
-            return self.read_direct_data(rec.zoffset)
-            
-        if self.current_offset != rec.zoffset:
-            self.load_contents(rec.zoffset)
-        ioffset = rec.ioffset
-        if ioffset + 4 > self.current_len:
+        mm, f_offset = file_offset(self.files, zoffset)
+        length = _S_U32.unpack_from(mm, f_offset)[0]
+        return mm[f_offset + 4 : f_offset + 4 + length]
+
+    def get_by_map(self, rec: np.void) -> bytes:
+        zoffset = int(rec['zoffset'])
+        ioffset = int(rec['ioffset'])
+        if ioffset == 0xFFFFFFFF:
+            return self.read_direct_data(zoffset)
+
+        contents = self._get_block(zoffset)
+        if ioffset + 4 > len(contents):
             raise IndexError()
-        
-        marker = struct.unpack('<I', self.contents_buf[ioffset:ioffset+4])[0]
+
+        marker = _S_U32.unpack_from(contents, ioffset)[0]
         if marker == 0:
-            if ioffset + 8 > self.current_len:
+            if ioffset + 8 > len(contents):
                 raise IndexError()
-            length = struct.unpack('<I', self.contents_buf[ioffset+4:ioffset+8])[0]
-            return self.contents_buf[ioffset+8:ioffset+8+length]
+            length = _S_U32.unpack_from(contents, ioffset + 4)[0]
+            return contents[ioffset+8:ioffset+8+length]
         else:
             length = marker
-            return self.contents_buf[ioffset+4:ioffset+4+length]
+            return contents[ioffset+4:ioffset+4+length]
 
     def get(self, id_: int) -> bytes:
         return self.get_by_map(self.index.get_by_id(id_))
@@ -321,12 +336,48 @@ class Rsc:
     def __len__(self) -> int:
         return len(self.index)
     
-    def export(self, path: str):
-        with open(path, 'wb') as f:
-            for i in range(len(self)):
-                id_, data = self.get_by_idx(i)
-                f.write(data)
-                f.write(b'\n')
+    def export(self, path: str, max_workers: int = 4):
+        map_ = self.index.map
+        n = len(map_)
+
+        # Group consecutive records sharing a compressed block; each block
+        # is inflated once, on a worker thread (zlib releases the GIL),
+        # while writes stay in record order on this thread.
+        runs = []
+        start = 0
+        for i in range(1, n + 1):
+            if i == n or map_[i]['zoffset'] != map_[start]['zoffset']:
+                runs.append((start, i))
+                start = i
+
+        with open(path, 'wb') as f, ThreadPoolExecutor(max_workers=max_workers) as ex:
+            window = max_workers * 2
+            futures = {}
+            next_run = 0
+
+            def submit_ahead(upto):
+                nonlocal next_run
+                while next_run < len(runs) and next_run < upto:
+                    s, _ = runs[next_run]
+                    rec = map_[s]
+                    if int(rec['ioffset']) != 0xFFFFFFFF:
+                        z = int(rec['zoffset'])
+                        if z not in futures and z not in self._block_cache:
+                            futures[z] = ex.submit(self._load_block, z)
+                    next_run += 1
+
+            submit_ahead(window)
+            for ri, (s, e) in enumerate(runs):
+                submit_ahead(ri + 1 + window)
+                fut = futures.pop(int(map_[s]['zoffset']), None)
+                if fut is not None:
+                    self._block_cache[int(map_[s]['zoffset'])] = fut.result()
+                    while len(self._block_cache) > self.BLOCK_CACHE_SIZE:
+                        self._block_cache.popitem(last=False)
+                for i in range(s, e):
+                    id_, data = self.get_by_idx(i)
+                    f.write(data)
+                    f.write(b'\n')
         
 def file_offset(files: List[ResourceFile], offset: int) -> Tuple[object, int]:
     for f in files:
@@ -350,6 +401,10 @@ if __name__ == "__main__":
     print(f"Entry count: {len(rsc)}")
     print(f"Index Version: {rsc.index.version}")
 
+    # Recovering parser tolerates the occasional malformed entry;
+    # reused across records to skip per-call parser setup
+    xml_parser = etree.XMLParser(recover=True)
+
     result = {}
     for i in range(len(rsc)):
         try:
@@ -358,10 +413,15 @@ if __name__ == "__main__":
             try:
                 text = data.decode('utf-8', errors='replace')
                 if text.strip().startswith('<'):
-                    soup = BeautifulSoup(text, 'html.parser')
-                    dic_item = soup.select_one('dic-item')
-                    if dic_item:
-                        item_id = dic_item.attrs.get('id', str(id_))
+                    root = etree.fromstring(data, xml_parser)
+                    if root is not None and root.tag == 'dic-item':
+                        dic_item = root
+                    elif root is not None:
+                        dic_item = root.find('.//dic-item')
+                    else:
+                        dic_item = None
+                    if dic_item is not None:
+                        item_id = dic_item.get('id') or str(id_)
                         # Just extract the text content or store the XML as string
                         result[item_id] = text
                     else:
@@ -371,7 +431,7 @@ if __name__ == "__main__":
             except UnicodeError:
                 # Binary data like font or sound - skip
                 pass
-                
+
         except Exception:
             pass
 